@@ -1,15 +1,20 @@
 import gymnasium as gym
 import numpy as np
 import chess
-import pygame
 import os
+import math
+import random
 from gymnasium import spaces
 from gym_bullet_chess.utils.encoding import (
-    get_board_tensor,
-    get_state_vector,
+    encode_observation,
     int_to_move,
 )
 
+# Screen (row, col) of each square, indexed by square (a1=0 ... h8=63).
+# White's view puts rank 8 on the top row; Black's view is rotated 180 degrees.
+_WHITE_VIEW_CELLS = tuple((7 - (sq >> 3), sq & 7) for sq in range(64))
+_BLACK_VIEW_CELLS = tuple((sq >> 3, 7 - (sq & 7)) for sq in range(64))
+
 
 class BulletChessEnv(gym.Env):
     """
@@ -34,6 +39,8 @@ class BulletChessEnv(gym.Env):
         time_limit=60.0,
         increment=0.0,
         capture_visual=False,
+        copy_obs=True,
+        fast_terminal_obs=False,
     ):
         """
         Initialize the Bullet Chess environment.
@@ -44,12 +51,22 @@ class BulletChessEnv(gym.Env):
             time_limit (float, optional): Initial time in seconds (default 60.0).
             increment (float, optional): Time increment per move in seconds (default 0.0).
             capture_visual (bool, optional): If True, observation includes 'board_img'.
+            copy_obs (bool, optional): If False, 'board' and 'state' are written
+                into buffers owned by the env and overwritten by the next
+                step/reset. Copy them before storing (e.g. in a replay buffer).
+                Default True returns fresh arrays.
+            fast_terminal_obs (bool, optional): If True, terminal steps return a
+                shared, read-only all-zero observation instead of encoding (and
+                rendering) the final position. Use when terminal observations
+                are discarded on reset.
         """
         self.render_mode = render_mode
         self.self_play = self_play
         self.time_limit = float(time_limit)
         self.increment = float(increment)
         self.capture_visual = capture_visual
+        self.copy_obs = copy_obs
+        self.fast_terminal_obs = fast_terminal_obs
 
         self.board = chess.Board()
         self.window = None
@@ -69,7 +86,7 @@ class BulletChessEnv(gym.Env):
 
         # Observation Space construction
         obs_dict = {
-            "board": spaces.Box(low=0, high=1, shape=(8, 8, 12), dtype=np.float32),
+            "board": spaces.Box(low=0, high=1, shape=(12, 8, 8), dtype=np.float32),
             "state": spaces.Box(low=0, high=np.inf, shape=(8,), dtype=np.float32),
         }
 
@@ -83,6 +100,23 @@ class BulletChessEnv(gym.Env):
 
         self.observation_space = spaces.Dict(obs_dict)
 
+        # Returned on terminal steps when fast_terminal_obs is set. Only built
+        # when needed: with capture_visual it includes a 512x512x3 image.
+        self._zero_obs = None
+        if self.fast_terminal_obs:
+            self._zero_obs = {}
+            for key, space in obs_dict.items():
+                zeros = np.zeros(space.shape, dtype=space.dtype)
+                zeros.flags.writeable = False
+                self._zero_obs[key] = zeros
+
+        # Observation buffers, filled in place by _get_obs
+        self._board_buf = np.zeros((12, 8, 8), dtype=np.float32)
+        self._state_buf = np.zeros(8, dtype=np.float32)
+
+        # Opponent RNG for scalar draws (reseeded from np_random on reset)
+        self._py_rng = random.Random()
+
         # Clocks
         self.white_time = self.time_limit
         self.black_time = self.time_limit
@@ -91,6 +125,9 @@ class BulletChessEnv(gym.Env):
         super().reset(seed=seed)
         self.board.reset()
 
+        # Derive the opponent RNG from np_random so seeding stays reproducible
+        self._py_rng.seed(int(self.np_random.integers(0, 2**31)))
+
         # Reset Clocks
         self.white_time = self.time_limit
         self.black_time = self.time_limit
@@ -107,19 +144,27 @@ class BulletChessEnv(gym.Env):
         elapsed_time = 0.0
         move_idx = action
 
-        # Robust unpacking (handles nested tuples if wrappers stack)
-        while isinstance(move_idx, (tuple, list)):
-            if len(move_idx) >= 2:
-                # Assuming (action, time) pattern
-                elapsed_time += float(move_idx[1])
-                move_idx = move_idx[0]
-            elif len(move_idx) == 1:
-                move_idx = move_idx[0]
-            else:
-                # Empty tuple?
-                break
+        # Two unpacking paths on purpose. RealTimeClock sends a flat
+        # (int, elapsed) tuple on every step, and exact type checks unpack it
+        # without the generic loop. Everything else (bare ints, lists, numpy
+        # integers, nested tuples from stacked wrappers) takes the loop.
+        if type(move_idx) is tuple and len(move_idx) == 2 and type(move_idx[0]) is int:
+            elapsed_time = float(move_idx[1])
+            move_idx = move_idx[0]
+        else:
+            # Robust unpacking (handles nested tuples if wrappers stack)
+            while isinstance(move_idx, (tuple, list)):
+                if len(move_idx) >= 2:
+                    # Assuming (action, time) pattern
+                    elapsed_time += float(move_idx[1])
+                    move_idx = move_idx[0]
+                elif len(move_idx) == 1:
+                    move_idx = move_idx[0]
+                else:
+                    # Empty tuple?
+                    break
 
-        if not np.isfinite(elapsed_time) or elapsed_time < 0:
+        if not math.isfinite(elapsed_time) or elapsed_time < 0:
             elapsed_time = 0.0
 
         # 1. Decrement Clock (Current Turn)
@@ -129,7 +174,13 @@ class BulletChessEnv(gym.Env):
             self.white_time -= elapsed_time
             if self.white_time <= 0:
                 # White timed out. White loses.
-                return self._get_obs(), -1.0, True, False, {"reason": "timeout"}
+                return (
+                    self._get_terminal_obs(),
+                    -1.0,
+                    True,
+                    False,
+                    {"reason": "timeout"},
+                )
         else:
             self.black_time -= elapsed_time
             if self.black_time <= 0:
@@ -137,7 +188,13 @@ class BulletChessEnv(gym.Env):
                 # In self play, the agent (Black) gets -1.0.
                 # In vs-cpu, the agent (White) gets +1.0.
                 reward = -1.0 if self.self_play else 1.0
-                return self._get_obs(), reward, True, False, {"reason": "timeout"}
+                return (
+                    self._get_terminal_obs(),
+                    reward,
+                    True,
+                    False,
+                    {"reason": "timeout"},
+                )
 
         # 3. Decode and Validate Move
         # Ensure integer
@@ -145,7 +202,7 @@ class BulletChessEnv(gym.Env):
             move_idx = int(move_idx)
         except (ValueError, TypeError):
             return (
-                self._get_obs(),
+                self._get_terminal_obs(),
                 -10.0,
                 True,
                 False,
@@ -154,7 +211,7 @@ class BulletChessEnv(gym.Env):
 
         if not (0 <= move_idx < self.action_space.n):
             return (
-                self._get_obs(),
+                self._get_terminal_obs(),
                 -10.0,
                 True,
                 False,
@@ -163,9 +220,15 @@ class BulletChessEnv(gym.Env):
 
         move = int_to_move(move_idx, self.board)
 
-        if move not in self.board.legal_moves:
+        if not self.board.is_legal(move):
             # Illegal move: Immediate loss, NO increment.
-            return self._get_obs(), -10.0, True, False, {"error": "illegal_move"}
+            return (
+                self._get_terminal_obs(),
+                -10.0,
+                True,
+                False,
+                {"error": "illegal_move"},
+            )
 
         # 4. Apply Move
         self.board.push(move)
@@ -176,54 +239,120 @@ class BulletChessEnv(gym.Env):
         else:
             self.black_time += self.increment
 
-        if self.board.is_game_over():
-            return self._handle_game_over()
-
         if self.self_play:
+            if self._is_game_over():
+                return self._handle_game_over()
+
             # Self-play: return 0.0 intermediate reward
             return self._get_obs(), 0.0, False, False, {}
 
+        # Generate the replies once: they decide whether the game is over
+        # and feed the opponent's move choice.
+        legal_moves = list(self.board.generate_legal_moves())
+        result = self._result_from_legal_moves(legal_moves)
+        if result is not None:
+            return self._handle_game_over(result)
+
         # 6. Opponent Move (Black - Random)
         # Only if we are in Single Player mode and it is now Black's turn
         if self.board.turn == chess.BLACK:
-            legal_moves = list(self.board.legal_moves)
-            if not legal_moves:
-                return self._handle_game_over()
-
-            opp_move = self.np_random.choice(legal_moves)
+            opp_move = legal_moves[self._py_rng.randrange(len(legal_moves))]
 
             # Opponent thinks...
             min_think = 0.1
             max_think = max(0.5, self.time_limit * 0.02)
-            opp_cost = self.np_random.uniform(min_think, max_think)
+            opp_cost = self._py_rng.uniform(min_think, max_think)
 
             self.black_time -= opp_cost
             if self.black_time <= 0:
-                return self._get_obs(), 1.0, True, False, {"reason": "opponent_timeout"}
+                return (
+                    self._get_terminal_obs(),
+                    1.0,
+                    True,
+                    False,
+                    {"reason": "opponent_timeout"},
+                )
 
             self.board.push(opp_move)
             self.black_time += self.increment
 
-            if self.board.is_game_over():
+            if self._is_game_over():
                 return self._handle_game_over()
 
         return self._get_obs(), 0.0, False, False, {}
 
     def _get_obs(self):
-        obs = {
-            "board": get_board_tensor(self.board),
-            "state": get_state_vector(
-                self.board, self.white_time, self.black_time, self.time_limit
-            ),
-        }
+        board, state = encode_observation(
+            self.board,
+            self.white_time,
+            self.black_time,
+            self.time_limit,
+            self._board_buf,
+            self._state_buf,
+        )
+
+        if self.copy_obs:
+            board = board.copy()
+            state = state.copy()
+
+        obs = {"board": board, "state": state}
 
         if self.capture_visual:
             obs["board_img"] = self._render_frame()
 
         return obs
 
-    def _handle_game_over(self):
-        result = self.board.result()
+    def _get_terminal_obs(self):
+        # Skip encoding the final position when the caller will reset anyway
+        if self.fast_terminal_obs:
+            # Fresh dict so callers cannot alter later terminal observations;
+            # the zero arrays themselves are shared and read-only.
+            return dict(self._zero_obs)
+        return self._get_obs()
+
+    def _result_from_legal_moves(self, legal_moves):
+        """
+        Returns the game result, or None if the game is not over.
+
+        Equivalent to board.result() for a finished game, but reuses the
+        side-to-move's legal moves instead of generating them again.
+
+        Args:
+            legal_moves (list[chess.Move]): All legal moves in the current position.
+
+        Returns:
+            str | None: "1-0", "0-1", "1/2-1/2", or None.
+        """
+        if not legal_moves:
+            if self.board.is_check():
+                # Checkmate: the side to move lost
+                return "0-1" if self.board.turn == chess.WHITE else "1-0"
+            return "1/2-1/2"
+
+        if self._is_automatic_draw():
+            return "1/2-1/2"
+
+        return None
+
+    def _is_game_over(self):
+        """Same as board.is_game_over(), using the guarded draw checks below."""
+        return not any(self.board.generate_legal_moves()) or self._is_automatic_draw()
+
+    def _is_automatic_draw(self):
+        """Insufficient material, seventy-five-move rule or fivefold repetition."""
+        board = self.board
+        # is_fivefold_repetition() scans the whole move stack on every call.
+        # A fifth occurrence needs at least 16 reversible plies (4 per cycle),
+        # which the halfmove clock bounds, so skip the scan until then.
+        return (
+            board.is_insufficient_material()
+            or board.is_seventyfive_moves()
+            or (board.halfmove_clock >= 16 and board.is_fivefold_repetition())
+        )
+
+    def _handle_game_over(self, result=None):
+        if result is None:
+            result = self.board.result()
         # Results: "1-0", "0-1", "1/2-1/2"
 
         # Base reward from White's perspective
@@ -246,7 +375,7 @@ class BulletChessEnv(gym.Env):
             # If White won ("1-0", reward=1.0), we want +1.0 for White.
             # So reward stays as is.
 
-        return self._get_obs(), reward, True, False, {"result": result}
+        return self._get_terminal_obs(), reward, True, False, {"result": result}
 
     def render(self):
         if self.render_mode == "ansi":
@@ -259,6 +388,8 @@ class BulletChessEnv(gym.Env):
         if self.assets_loaded:
             return
 
+        import pygame
+
         square_size = self.window_size // 8
 
         piece_map = {
@@ -288,6 +419,10 @@ class BulletChessEnv(gym.Env):
         self.assets_loaded = True
 
     def _render_frame(self):
+        # pygame is an optional (gui) dependency and slow to import, so it is
+        # only loaded once a frame is actually rendered.
+        import pygame
+
         if self.window is None and self.render_mode == "human":
             pygame.init()
             pygame.display.init()
@@ -320,33 +455,28 @@ class BulletChessEnv(gym.Env):
 
         is_white_view = self.board.turn == chess.WHITE
 
-        for r in range(8):
-            for c in range(8):
-                # Draw Square
-                color = light_sq if (r + c) % 2 == 0 else dark_sq
-                rect = pygame.Rect(
-                    c * square_size, r * square_size, square_size, square_size
-                )
-                pygame.draw.rect(self.canvas, color, rect)
+        cells = _WHITE_VIEW_CELLS if is_white_view else _BLACK_VIEW_CELLS
 
-                if is_white_view:
-                    rank = 7 - r
-                    file = c
-                else:
-                    rank = r
-                    file = 7 - c
-
-                square_idx = chess.square(file, rank)
-                piece = self.board.piece_at(square_idx)
+        for r, c in cells:
+            # Draw Square
+            color = light_sq if (r + c) % 2 == 0 else dark_sq
+            rect = pygame.Rect(
+                c * square_size, r * square_size, square_size, square_size
+            )
+            pygame.draw.rect(self.canvas, color, rect)
 
-                if piece:
-                    symbol = piece.symbol()
+        # Draw Pieces (occupied squares only)
+        for square, piece in self.board.piece_map().items():
+            symbol = piece.symbol()
 
-                    if symbol in self.piece_images:
-                        self.canvas.blit(self.piece_images[symbol], rect)
-                    else:
-                        # Fallback text rendering
-                        pass  # Kept simple for now
+            if symbol in self.piece_images:
+                r, c = cells[square]
+                self.canvas.blit(
+                    self.piece_images[symbol], (c * square_size, r * square_size)
+                )
+            else:
+                # Fallback text rendering
+                pass  # Kept simple for now
 
         if self.render_mode == "human":
             self.window.blit(self.canvas, (0, 0))
@@ -360,5 +490,7 @@ class BulletChessEnv(gym.Env):
 
     def close(self):
         if self.window is not None:
+            import pygame
+
             pygame.display.quit()
             pygame.quit()
@@ -6,6 +6,8 @@ Includes encoding/decoding logic for board states and actions.
 from gym_bullet_chess.utils.encoding import (
     get_board_tensor,
     get_state_vector,
+    encode_observation,
+    encode_observation_batch,
     int_to_move,
     decode_action_to_squares,
 )
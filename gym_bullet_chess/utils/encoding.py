@@ -1,14 +1,67 @@
+from typing import Optional, Sequence
+
 import numpy as np
 import chess
 
+# White promotes on rank 7 (8th rank), Black on rank 0 (1st rank)
+_PROMOTION_RANKS = {chess.WHITE: 7, chess.BLACK: 0}
+
 
-def get_board_tensor(board: chess.Board) -> np.ndarray:
+def _piece_bitboards(board: chess.Board) -> list[int]:
+    """
+    Returns the 12 (color, piece_type) bitboards in layer order.
     """
-    Converts a chess.Board to an (8, 8, 12) float32 tensor suitable for CNNs.
+    white = board.occupied_co[chess.WHITE]
+    black = board.occupied_co[chess.BLACK]
+    pawns, knights, bishops = board.pawns, board.knights, board.bishops
+    rooks, queens, kings = board.rooks, board.queens, board.kings
+
+    return [
+        pawns & white,
+        knights & white,
+        bishops & white,
+        rooks & white,
+        queens & white,
+        kings & white,
+        pawns & black,
+        knights & black,
+        bishops & black,
+        rooks & black,
+        queens & black,
+        kings & black,
+    ]
+
+
+def _unpack_bitboards(bitboards: np.ndarray) -> np.ndarray:
+    """
+    Expands bitboards of shape (..., 12) into uint8 planes of shape (..., 12, 8, 8).
+    """
+    # One little-endian uint64 per layer; bit i of each word is square i
+    # (a1=0 ... h8=63), so a single unpack expands every plane at once.
+    words = np.asarray(bitboards, dtype="<u8")
+    bits = np.unpackbits(words.view(np.uint8), bitorder="little")
+
+    # square = rank * 8 + file, so each 64-bit plane reshapes to [rank, file]
+    return bits.reshape(words.shape + (8, 8))
+
+
+def _piece_planes(board: chess.Board) -> np.ndarray:
+    """
+    Unpacks the 12 piece bitboards into a (12, 8, 8) uint8 [layer, rank, file] array.
+    """
+    return _unpack_bitboards(np.array(_piece_bitboards(board), dtype="<u8"))
+
+
+def get_board_tensor(
+    board: chess.Board, out: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Converts a chess.Board to a (12, 8, 8) float32 tensor suitable for CNNs.
 
     The board is viewed from White's perspective (rank 0 is White's 1st rank).
+    Indexed as [layer, rank, file], the (C, H, W) layout expected by e.g. Conv2d.
 
-    Layers (Channel last):
+    Layers (Channel first):
         0: White Pawns
         1: White Knights
         2: White Bishops
@@ -24,31 +77,52 @@ def get_board_tensor(board: chess.Board) -> np.ndarray:
 
     Args:
         board (chess.Board): The python-chess board object.
+        out (np.ndarray, optional): Preallocated (12, 8, 8) float32 buffer to
+            write into. Every element is overwritten.
 
     Returns:
-        np.ndarray: Shape (8, 8, 12) with values 0.0 or 1.0.
+        np.ndarray: Shape (12, 8, 8) with values 0.0 or 1.0 (``out`` if given).
     """
-    tensor = np.zeros((8, 8, 12), dtype=np.float32)
+    planes = _piece_planes(board)
 
-    for square in chess.SQUARES:
-        piece = board.piece_at(square)
-        if piece:
-            # 0-based rank and file
-            rank = chess.square_rank(square)
-            file = chess.square_file(square)
+    if out is None:
+        return planes.astype(np.float32)
 
-            # Determine layer index
-            layer_offset = 0 if piece.color == chess.WHITE else 6
-            # piece_type: P=1...K=6 -> index 0...5
-            layer = layer_offset + (piece.piece_type - 1)
+    np.copyto(out, planes)
+    return out
 
-            tensor[rank, file, layer] = 1.0
 
-    return tensor
+def _state_values(
+    board: chess.Board, white_time: float, black_time: float, max_time: float
+) -> tuple[float, ...]:
+    """
+    Computes the 8 state vector entries (see get_state_vector) as a tuple.
+    """
+    # Test the rook-square bits directly. clean_castling_rights() (computed
+    # once) drops stale bits, e.g. from a FEN claiming rights for a missing rook.
+    castling = board.clean_castling_rights()
+
+    # Note: With increment, time can technically exceed max_time.
+    # We allow the value to go above 1.0 rather than clamping,
+    # as having "bonus time" is a valid state.
+    return (
+        1.0 if board.turn == chess.WHITE else 0.0,  # 0. Turn
+        1.0 if castling & chess.BB_H1 else 0.0,  # 1-4. Castling Rights
+        1.0 if castling & chess.BB_A1 else 0.0,
+        1.0 if castling & chess.BB_H8 else 0.0,
+        1.0 if castling & chess.BB_A8 else 0.0,
+        1.0 if board.ep_square is not None else 0.0,  # 5. En Passant
+        max(0.0, white_time / max_time),  # 6-7. Normalized Time
+        max(0.0, black_time / max_time),
+    )
 
 
 def get_state_vector(
-    board: chess.Board, white_time: float, black_time: float, max_time: float = 60.0
+    board: chess.Board,
+    white_time: float,
+    black_time: float,
+    max_time: float = 60.0,
+    out: Optional[np.ndarray] = None,
 ) -> np.ndarray:
     """
     Returns an 8-dim vector representing global game state and clocks.
@@ -68,32 +142,106 @@ def get_state_vector(
         white_time (float): Remaining seconds for White.
         black_time (float): Remaining seconds for Black.
         max_time (float): The initial time control (e.g., 60.0).
+        out (np.ndarray, optional): Preallocated (8,) float32 buffer to write
+            into. Every element is overwritten.
 
     Returns:
-        np.ndarray: Shape (8,) float32 vector.
+        np.ndarray: Shape (8,) float32 vector (``out`` if given).
     """
-    state = np.zeros(8, dtype=np.float32)
+    values = _state_values(board, white_time, black_time, max_time)
 
-    # 0. Turn
-    state[0] = 1.0 if board.turn == chess.WHITE else 0.0
+    if out is None:
+        return np.array(values, dtype=np.float32)
 
-    # 1-4. Castling Rights
-    state[1] = 1.0 if board.has_kingside_castling_rights(chess.WHITE) else 0.0
-    state[2] = 1.0 if board.has_queenside_castling_rights(chess.WHITE) else 0.0
-    state[3] = 1.0 if board.has_kingside_castling_rights(chess.BLACK) else 0.0
-    state[4] = 1.0 if board.has_queenside_castling_rights(chess.BLACK) else 0.0
+    out[:] = values
+    return out
 
-    # 5. En Passant availability
-    state[5] = 1.0 if board.ep_square is not None else 0.0
 
-    # 6-7. Normalized Time
-    # Note: With increment, time can technically exceed max_time.
-    # We allow the value to go above 1.0 rather than clamping,
-    # as having "bonus time" is a valid state.
-    state[6] = max(0.0, white_time / max_time)
-    state[7] = max(0.0, black_time / max_time)
+def encode_observation(
+    board: chess.Board,
+    white_time: float,
+    black_time: float,
+    max_time: float,
+    board_out: np.ndarray,
+    state_out: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Writes both observation arrays for a position into preallocated buffers.
 
-    return state
+    Same output as get_board_tensor(board, out=board_out) followed by
+    get_state_vector(..., out=state_out), done in a single pass over the board.
+
+    Args:
+        board (chess.Board): The current board.
+        white_time (float): Remaining seconds for White.
+        black_time (float): Remaining seconds for Black.
+        max_time (float): The initial time control (e.g., 60.0).
+        board_out (np.ndarray): (12, 8, 8) float32 buffer, fully overwritten.
+        state_out (np.ndarray): (8,) float32 buffer, fully overwritten.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: (board_out, state_out).
+    """
+    np.copyto(board_out, _piece_planes(board))
+    state_out[:] = _state_values(board, white_time, black_time, max_time)
+    return board_out, state_out
+
+
+def encode_observation_batch(
+    boards: Sequence[chess.Board],
+    white_times: Sequence[float],
+    black_times: Sequence[float],
+    max_time: float,
+    board_out: np.ndarray,
+    state_out: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Batched encode_observation for N boards, e.g. the sub-envs of a vector env.
+
+    The piece bitboards of all boards are unpacked with a single numpy call.
+    This is a standalone utility for custom vector envs or rollout loops that
+    hold the boards directly; BulletChessEnv itself does not call it.
+
+    Args:
+        boards (Sequence[chess.Board]): The N boards to encode.
+        white_times (Sequence[float]): Remaining seconds for White, per board.
+        black_times (Sequence[float]): Remaining seconds for Black, per board.
+        max_time (float): The initial time control (e.g., 60.0).
+        board_out (np.ndarray): (N, 12, 8, 8) float32 buffer, fully overwritten.
+        state_out (np.ndarray): (N, 8) float32 buffer, fully overwritten.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: (board_out, state_out).
+
+    Raises:
+        ValueError: If the inputs and buffers do not all have N entries.
+    """
+    n = len(boards)
+    if not (
+        len(white_times) == len(black_times) == n
+        and board_out.shape[0] == state_out.shape[0] == n
+    ):
+        raise ValueError(
+            f"Batch size mismatch: {n} boards, {len(white_times)} white times, "
+            f"{len(black_times)} black times, board_out {board_out.shape}, "
+            f"state_out {state_out.shape}"
+        )
+
+    # reshape keeps the (N, 12) / (N, 8) shapes when the batch is empty
+    bitboards = np.array(
+        [_piece_bitboards(board) for board in boards], dtype="<u8"
+    ).reshape(n, 12)
+    np.copyto(board_out, _unpack_bitboards(bitboards))
+
+    states = np.array(
+        [
+            _state_values(board, white_time, black_time, max_time)
+            for board, white_time, black_time in zip(boards, white_times, black_times)
+        ],
+        dtype=np.float32,
+    ).reshape(n, 8)
+    np.copyto(state_out, states)
+    return board_out, state_out
 
 
 def decode_action_to_squares(action_idx: int) -> tuple[int, int]:
@@ -106,9 +254,7 @@ def decode_action_to_squares(action_idx: int) -> tuple[int, int]:
     Returns:
         tuple[int, int]: (from_square, to_square) indices (0-63).
     """
-    from_sq = action_idx // 64
-    to_sq = action_idx % 64
-    return from_sq, to_sq
+    return action_idx >> 6, action_idx & 63
 
 
 def int_to_move(action_idx: int, board: chess.Board) -> chess.Move:
@@ -125,18 +271,18 @@ def int_to_move(action_idx: int, board: chess.Board) -> chess.Move:
     Returns:
         chess.Move: The corresponding python-chess Move object.
     """
-    from_sq, to_sq = decode_action_to_squares(action_idx)
+    from_sq = action_idx >> 6
+    to_sq = action_idx & 63
 
     promotion = None
     piece = board.piece_at(from_sq)
 
     # Check for promotion condition
-    if piece and piece.piece_type == chess.PAWN:
-        rank = chess.square_rank(to_sq)
-        # White promotes on rank 7 (8th rank), Black on rank 0 (1st rank)
-        if (piece.color == chess.WHITE and rank == 7) or (
-            piece.color == chess.BLACK and rank == 0
-        ):
-            promotion = chess.QUEEN
+    if (
+        piece is not None
+        and piece.piece_type == chess.PAWN
+        and (to_sq >> 3) == _PROMOTION_RANKS[piece.color]
+    ):
+        promotion = chess.QUEEN
 
     return chess.Move(from_sq, to_sq, promotion=promotion)
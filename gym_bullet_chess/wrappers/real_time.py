@@ -40,12 +40,12 @@ class RealTimeClock(gym.Wrapper):
         The elapsed time is bundled with the action into a tuple and passed
         to the underlying environment.
         """
+        now = time.perf_counter()
         if self.last_time is None:
             # Should not happen if reset was called, but safety first
-            self.last_time = time.perf_counter()
-
-        current_time = time.perf_counter()
-        elapsed = current_time - self.last_time
+            elapsed = 0.0
+        else:
+            elapsed = now - self.last_time
 
         # Pass the tuple (action, elapsed) to the inner env
         # The inner BulletChessEnv is modified to handle this tuple.
@@ -15,7 +15,7 @@ class TestBulletChessEnv(unittest.TestCase):
 
     def test_reset(self):
         obs, info = self.env.reset()
-        self.assertEqual(obs["board"].shape, (8, 8, 12))
+        self.assertEqual(obs["board"].shape, (12, 8, 8))
         self.assertEqual(obs["state"].shape, (8,))
         # Initial Time: 60/60 = 1.0
         self.assertAlmostEqual(obs["state"][6], 1.0)
@@ -55,6 +55,117 @@ class TestBulletChessEnv(unittest.TestCase):
         self.assertEqual(reward, 1.0)
         self.assertEqual(info["result"], "1-0")
 
+    def test_stalemate_draw(self):
+        self.env.reset()
+        board = self.env.unwrapped.board
+        # FEN: "7k/8/8/8/8/8/8/K5Q1 w - - 0 1" (White K a1, Q g1. Black K h8).
+        # Move Qg6 leaves Black with no legal moves and not in check.
+        board.set_fen("7k/8/8/8/8/8/8/K5Q1 w - - 0 1")
+
+        # Action: g1 (6) -> g6 (46)
+        action = 6 * 64 + 46
+        obs, reward, term, trunc, info = self.env.step(action)
+        self.assertTrue(term)
+        self.assertEqual(reward, 0.0)
+        self.assertEqual(info["result"], "1/2-1/2")
+
+    def test_fivefold_repetition_draw(self):
+        env = gym.make("BulletChess-v0", self_play=True)
+        env.reset()
+        # Ng1-f3, Ng8-f6, Nf3-g1, Nf6-g8: the start position recurs every 4 plies
+        cycle = [6 * 64 + 21, 62 * 64 + 45, 21 * 64 + 6, 45 * 64 + 62]
+        for ply, action in enumerate(cycle * 4, start=1):
+            obs, reward, term, trunc, info = env.step(action)
+            # The 5th occurrence is reached on the 16th ply
+            self.assertEqual(term, ply == 16)
+        self.assertEqual(reward, 0.0)
+        self.assertEqual(info["result"], "1/2-1/2")
+
+    def test_result_from_legal_moves_matches_board(self):
+        env = self.env.unwrapped
+        rng = np.random.default_rng(0)
+        fens = [
+            "7k/6Q1/5K2/8/8/8/8/8 b - - 0 1",  # checkmate
+            "7k/8/6Q1/8/8/8/8/K7 b - - 0 1",  # stalemate
+            "7k/8/8/8/8/8/8/K7 w - - 0 1",  # insufficient material
+            "7k/8/8/8/8/8/R7/K7 w - - 150 100",  # seventy-five moves
+        ]
+        for fen in fens:
+            env.board.set_fen(fen)
+            legal_moves = list(env.board.generate_legal_moves())
+            self.assertEqual(
+                env._result_from_legal_moves(legal_moves), env.board.result()
+            )
+
+        env.board.reset()
+        for _ in range(500):
+            legal_moves = list(env.board.generate_legal_moves())
+            expected = env.board.result() if env.board.is_game_over() else None
+            self.assertEqual(env._result_from_legal_moves(legal_moves), expected)
+            if expected is not None:
+                env.board.reset()
+                continue
+            env.board.push(legal_moves[rng.integers(len(legal_moves))])
+
+    def test_seeded_opponent_is_reproducible(self):
+        def play(seed):
+            env = gym.make("BulletChess-v0")
+            env.reset(seed=seed)
+            moves, clocks = [], []
+            # Shuffle knights back and forth so the game never ends early
+            for action in [6 * 64 + 21, 21 * 64 + 6] * 5:
+                obs, reward, term, trunc, info = env.step(action)
+                if term:
+                    break
+                moves.append(env.unwrapped.board.peek())
+                clocks.append(float(obs["state"][7]))
+            return moves, clocks
+
+        self.assertEqual(play(123), play(123))
+        self.assertNotEqual(play(123), play(456))
+
+    def test_copy_obs(self):
+        # Default: each observation owns its arrays
+        obs_a, _ = self.env.reset()
+        obs_b, *_ = self.env.step(12 * 64 + 28)
+        self.assertFalse(np.shares_memory(obs_a["board"], obs_b["board"]))
+
+        # copy_obs=False: observations alias the env's buffers. The passive env
+        # checker warns about exactly that, so it is disabled (see README).
+        env = gym.make("BulletChess-v0", copy_obs=False, disable_env_checker=True)
+        obs_a, _ = env.reset()
+        obs_b, *_ = env.step(12 * 64 + 28)
+        self.assertIs(obs_a["board"], obs_b["board"])
+        self.assertIs(obs_a["state"], obs_b["state"])
+
+    def test_fast_terminal_obs(self):
+        env = gym.make(
+            "BulletChess-v0", fast_terminal_obs=True, disable_env_checker=True
+        )
+        env.reset()
+        # Illegal: a1a8 (0->56) terminates with the all-zero observation
+        zero_obs, reward, term, trunc, info = env.step(0 * 64 + 56)
+        self.assertTrue(term)
+        self.assertTrue(env.observation_space.contains(zero_obs))
+        self.assertFalse(zero_obs["board"].any())
+        self.assertFalse(zero_obs["state"].any())
+        self.assertFalse(zero_obs["board"].flags.writeable)
+
+        # Mutating the returned dict must not leak into later terminal steps
+        del zero_obs["board"]
+        zero_obs["extra"] = np.ones(3)
+
+        # Timeout: the same shared arrays, the final clock is not encoded
+        env.reset()
+        term_obs, reward, term, trunc, info = env.step((12 * 64 + 28, 61.0))
+        self.assertTrue(term)
+        self.assertEqual(sorted(term_obs), ["board", "state"])
+        self.assertTrue(env.observation_space.contains(term_obs))
+        self.assertIs(term_obs["state"], zero_obs["state"])
+
+        # Without the flag no zero observation is allocated
+        self.assertIsNone(self.env.unwrapped._zero_obs)
+
 
 if __name__ == "__main__":
     unittest.main()
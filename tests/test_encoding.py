@@ -0,0 +1,173 @@
+import unittest
+import numpy as np
+import chess
+from gym_bullet_chess.utils.encoding import (
+    decode_action_to_squares,
+    encode_observation,
+    encode_observation_batch,
+    get_board_tensor,
+    get_state_vector,
+    int_to_move,
+)
+
+
+def reference_board_tensor(board):
+    """Square-by-square encoding used as ground truth for the bitboard path."""
+    tensor = np.zeros((12, 8, 8), dtype=np.float32)
+    for square in chess.SQUARES:
+        piece = board.piece_at(square)
+        if piece:
+            layer = (0 if piece.color == chess.WHITE else 6) + piece.piece_type - 1
+            tensor[layer, chess.square_rank(square), chess.square_file(square)] = 1.0
+    return tensor
+
+
+class TestEncoding(unittest.TestCase):
+    FENS = [
+        chess.STARTING_FEN,
+        "7k/Q7/5K2/8/8/8/8/8 w - - 0 1",
+        "r1bqkb1r/pppp1ppp/2n2n2/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR w KQkq - 4 4",
+        "8/P6k/8/8/8/8/6Kp/8 b - - 0 1",
+    ]
+
+    def test_board_tensor_matches_reference(self):
+        for fen in self.FENS:
+            board = chess.Board(fen)
+            tensor = get_board_tensor(board)
+            self.assertEqual(tensor.shape, (12, 8, 8))
+            self.assertEqual(tensor.dtype, np.float32)
+            np.testing.assert_array_equal(tensor, reference_board_tensor(board))
+
+    def test_board_tensor_random_games(self):
+        rng = np.random.default_rng(0)
+        board = chess.Board()
+        for _ in range(200):
+            if board.is_game_over():
+                board.reset()
+            moves = list(board.legal_moves)
+            board.push(moves[rng.integers(len(moves))])
+            np.testing.assert_array_equal(
+                get_board_tensor(board), reference_board_tensor(board)
+            )
+
+    def test_state_vector_castling_rights(self):
+        fens = self.FENS + [
+            "r3k2r/8/8/8/8/8/8/R3K2R w Kq - 0 1",
+            "r3k2r/8/8/8/8/8/8/R3K2R b Qk e3 0 1",
+            # Rights claimed for rooks/kings that are not on their squares
+            "4k3/8/8/8/8/8/8/4K3 w KQkq - 0 1",
+            "r3k2r/8/8/8/8/8/8/R4K1R w KQkq - 0 1",
+        ]
+        for fen in fens:
+            board = chess.Board(fen)
+            state = get_state_vector(board, 60.0, 60.0, 60.0)
+            expected = [
+                board.has_kingside_castling_rights(chess.WHITE),
+                board.has_queenside_castling_rights(chess.WHITE),
+                board.has_kingside_castling_rights(chess.BLACK),
+                board.has_queenside_castling_rights(chess.BLACK),
+            ]
+            np.testing.assert_array_equal(state[1:5], np.array(expected, np.float32))
+
+    def test_out_buffers_are_overwritten(self):
+        board_buf = np.full((12, 8, 8), 7.0, dtype=np.float32)
+        state_buf = np.full(8, 7.0, dtype=np.float32)
+        board = chess.Board(self.FENS[2])
+
+        self.assertIs(get_board_tensor(board, out=board_buf), board_buf)
+        self.assertIs(
+            get_state_vector(board, 30.0, 45.0, 60.0, out=state_buf), state_buf
+        )
+        np.testing.assert_array_equal(board_buf, get_board_tensor(board))
+        np.testing.assert_array_equal(
+            state_buf, get_state_vector(board, 30.0, 45.0, 60.0)
+        )
+
+    def test_encode_observation_matches_separate_encoders(self):
+        board_buf = np.full((12, 8, 8), 7.0, dtype=np.float32)
+        state_buf = np.full(8, 7.0, dtype=np.float32)
+        for fen in self.FENS:
+            board = chess.Board(fen)
+            board_out, state_out = encode_observation(
+                board, 12.5, 70.0, 60.0, board_buf, state_buf
+            )
+            self.assertIs(board_out, board_buf)
+            self.assertIs(state_out, state_buf)
+            np.testing.assert_array_equal(board_buf, get_board_tensor(board))
+            np.testing.assert_array_equal(
+                state_buf, get_state_vector(board, 12.5, 70.0, 60.0)
+            )
+
+    def test_encode_observation_batch(self):
+        boards = [chess.Board(fen) for fen in self.FENS]
+        white_times = [60.0, 30.0, 0.0, 75.0]
+        black_times = [60.0, 12.5, 45.0, -1.0]
+        board_buf = np.full((len(boards), 12, 8, 8), 7.0, dtype=np.float32)
+        state_buf = np.full((len(boards), 8), 7.0, dtype=np.float32)
+
+        board_out, state_out = encode_observation_batch(
+            boards, white_times, black_times, 60.0, board_buf, state_buf
+        )
+        self.assertIs(board_out, board_buf)
+        self.assertIs(state_out, state_buf)
+        for i, board in enumerate(boards):
+            np.testing.assert_array_equal(board_buf[i], get_board_tensor(board))
+            np.testing.assert_array_equal(
+                state_buf[i],
+                get_state_vector(board, white_times[i], black_times[i], 60.0),
+            )
+
+        # Empty batch
+        board_out, state_out = encode_observation_batch(
+            [],
+            [],
+            [],
+            60.0,
+            np.empty((0, 12, 8, 8), dtype=np.float32),
+            np.empty((0, 8), dtype=np.float32),
+        )
+        self.assertEqual(board_out.shape, (0, 12, 8, 8))
+        self.assertEqual(state_out.shape, (0, 8))
+
+    def test_encode_observation_batch_size_mismatch(self):
+        boards = [chess.Board(fen) for fen in self.FENS[:2]]
+        board_buf = np.zeros((2, 12, 8, 8), dtype=np.float32)
+        state_buf = np.zeros((2, 8), dtype=np.float32)
+
+        with self.assertRaises(ValueError):
+            encode_observation_batch(boards, [60.0], [60.0], 60.0, board_buf, state_buf)
+        with self.assertRaises(ValueError):
+            encode_observation_batch(
+                boards, [60.0, 60.0], [60.0], 60.0, board_buf, state_buf
+            )
+        with self.assertRaises(ValueError):
+            encode_observation_batch(
+                boards, [60.0, 60.0], [60.0, 60.0], 60.0, board_buf[:1], state_buf
+            )
+        with self.assertRaises(ValueError):
+            encode_observation_batch(
+                boards, [60.0, 60.0], [60.0, 60.0], 60.0, board_buf, state_buf[:1]
+            )
+
+    def test_decode_action_to_squares(self):
+        for from_sq, to_sq in [(0, 0), (12, 28), (48, 54), (63, 63)]:
+            self.assertEqual(
+                decode_action_to_squares(from_sq * 64 + to_sq), (from_sq, to_sq)
+            )
+
+    def test_int_to_move_promotion(self):
+        board = chess.Board("8/P6k/8/8/8/8/6Kp/8 w - - 0 1")
+        # White pawn a7 (48) -> a8 (56) promotes to Queen
+        self.assertEqual(int_to_move(48 * 64 + 56, board), chess.Move.from_uci("a7a8q"))
+        # White king g2 (14) -> h1 (7) reaches the back rank but never promotes
+        self.assertEqual(int_to_move(14 * 64 + 7, board), chess.Move.from_uci("g2h1"))
+
+        board.turn = chess.BLACK
+        # Black pawn h2 (15) -> h1 (7) promotes to Queen
+        self.assertEqual(int_to_move(15 * 64 + 7, board), chess.Move.from_uci("h2h1q"))
+        # Black king h7 (55) -> h8 (63) is not a promotion
+        self.assertEqual(int_to_move(55 * 64 + 63, board), chess.Move.from_uci("h7h8"))
+
+
+if __name__ == "__main__":
+    unittest.main()
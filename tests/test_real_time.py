@@ -2,6 +2,7 @@ import unittest
 import gymnasium as gym
 import time
 import gym_bullet_chess
+from gym_bullet_chess.envs import BulletChessEnv
 from gym_bullet_chess.wrappers.real_time import RealTimeClock
 
 
@@ -141,6 +142,38 @@ class TestRealTime(unittest.TestCase):
         self.assertFalse(terminated)
         self.assertAlmostEqual(obs["state"][6] * 60.0, 55.0)
 
+    def test_edge_case_nested_tuple(self):
+        """Edge Case: Stacked wrappers nest (action, time) tuples; times add up."""
+        self.base_env.reset()
+        action_idx = 12 * 64 + 28
+        obs, reward, terminated, truncated, info = self.base_env.step(
+            ((action_idx, 2.0), 3.0)
+        )
+        self.assertFalse(terminated)
+        self.assertAlmostEqual(obs["state"][6] * 60.0, 55.0, places=4)
+
+        # Non-finite time is treated as 0.0 elapsed
+        self.base_env.reset()
+        obs, reward, terminated, truncated, info = self.base_env.step(
+            (action_idx, float("nan"))
+        )
+        self.assertFalse(terminated)
+        self.assertAlmostEqual(obs["state"][6] * 60.0, 60.0, places=4)
+
+    def test_step_before_reset(self):
+        """Edge Case: step() without reset() has no start time, so 0.0 is deducted."""
+        # Use the raw env: gym.make's OrderEnforcing wrapper forbids step before reset
+        rt_env = RealTimeClock(BulletChessEnv())
+        time.sleep(0.2)
+
+        obs, reward, terminated, truncated, info = rt_env.step(12 * 64 + 28)
+
+        self.assertFalse(terminated)
+        self.assertEqual(obs["state"][6], 1.0)
+        self.assertEqual(rt_env.unwrapped.white_time, 60.0)
+        # The clock is running for the next move
+        self.assertIsNotNone(rt_env.last_time)
+
 
 if __name__ == "__main__":
     unittest.main()